@@ -12,12 +12,13 @@ LOGARITHM_VAULT_ADDRESSES = {
     ]
 }
 
+# Multicall3 is deployed at the same address on every supported chain
 MULTICALL_ADDRESSES = {
-    42161: "0x842eC2c7D803033Edf55E478F461FC547Bc54EB2",
+    42161: "0xcA11bde05977b3631167028862bE2a173976CA11",
 }
 
 LOGARITHM_VAULT_ABI_PATH = "abis/LogarithmVault.abi.json"
-MULTICALL_ABI_PATH = "abis/Multicall2.abi.json"
+MULTICALL_ABI_PATH = "abis/Multicall3.abi.json"
 
 # Alchemy RPC URLs for each network
 ALCHEMY_RPC_URLS = {
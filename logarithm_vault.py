@@ -1,127 +1,129 @@
-import json
+import functools
+from datetime import datetime, timezone
 from typing import List, Optional
 from mcp.server.fastmcp import FastMCP
-from utils.web3 import validate_address, get_contract, encode_calldata, decode_string, decode_uint256, decode_multicall_try_block_and_aggregate_result, from_wei, from_szabo, quantize_decimal
+from utils.web3 import validate_address, encode_calldata, encode_address_calldata, get_function_selector, decode_return_batch, multicall_aggregate, quantize_decimal
 from utils.subgraph import get_share_price_history_from_subgraph
-from constants import LOGARITHM_VAULT_ADDRESSES, MULTICALL_ADDRESSES, LOGARITHM_VAULT_ABI_PATH, MULTICALL_ABI_PATH, ALCHEMY_RPC_URLS, SUBGRAPH_API_KEY
+from constants import LOGARITHM_VAULT_ADDRESSES, LOGARITHM_VAULT_ABI_PATH, SUBGRAPH_API_KEY
 
 # Initialize FastMCP server
 mcp = FastMCP("Logarithm-vault")
 
+# The no-arg vault view calldata is constant, so the selector hashing and
+# encoding happen once at import instead of on every request
+VAULT_INFO_CALLDATA = [
+    encode_calldata(LOGARITHM_VAULT_ABI_PATH, function_name)
+    for function_name in (
+        'name', 'symbol', 'totalSupply', 'totalAssets',
+        'entryCost', 'exitCost', 'idleAssets', 'totalPendingWithdraw'
+    )
+]
+
+MAX_DEPOSIT_SELECTOR = get_function_selector(LOGARITHM_VAULT_ABI_PATH, 'maxDeposit')
+BALANCE_OF_SELECTOR = get_function_selector(LOGARITHM_VAULT_ABI_PATH, 'balanceOf')
+
+@functools.lru_cache(maxsize=128)
+def depositor_calldata(depositor: str) -> tuple:
+    """Encode the depositor-scoped calldata once per (checksummed) depositor."""
+    return (
+        encode_address_calldata(MAX_DEPOSIT_SELECTOR, depositor),
+        encode_address_calldata(BALANCE_OF_SELECTOR, depositor)
+    )
+
+# Decode schema matching VAULT_INFO_CALLDATA order: vault shares/assets are
+# 6-decimal (szabo) values, the cost rates are 18-decimal (wei) values
+VAULT_INFO_SCHEMA = (
+    ('str', 0), ('str', 0), ('uint', 6), ('uint', 6),
+    ('uint', 18), ('uint', 18), ('uint', 6), ('uint', 6)
+)
+DEPOSITOR_INFO_SCHEMA = VAULT_INFO_SCHEMA + (('uint', 6), ('uint', 6))
+
+def _decode_vault_info(return_data: list, base: int, with_depositor: bool) -> dict:
+    """Decode one vault's slice of the multicall return data."""
+    schema = DEPOSITOR_INFO_SCHEMA if with_depositor else VAULT_INFO_SCHEMA
+    values = decode_return_batch(return_data, base, schema)
+    total_supply = values[2]
+    total_assets = values[3]
+    info = {
+        'name': values[0],
+        'symbol': values[1],
+        'totalSupply': total_supply,
+        'totalAssets': total_assets,
+        'sharePrice': quantize_decimal(total_assets / total_supply),
+        'entryCostRate': quantize_decimal(values[4]),
+        'exitCostRate': quantize_decimal(values[5]),
+        'idleAssets': values[6],
+        'totalPendingWithdraw': values[7]
+    }
+    if with_depositor:
+        info['maxDeposit'] = values[8]
+        info['balanceOf'] = values[9]
+    return info
+
+async def _vault_infos(depositor: Optional[str] = None) -> dict:
+    """Fetch and decode the info of every vault in a single multicall."""
+    chain_id = 42161 # only support arbitrum for now
+
+    # the calldata template is identical for every vault; the no-arg part is
+    # precomputed at import, only the depositor extension is encoded here
+    calldata_template = list(VAULT_INFO_CALLDATA)
+
+    if depositor:
+        calldata_template.extend(depositor_calldata(depositor))
+
+    # Create list of calls for multicall
+    addresses = LOGARITHM_VAULT_ADDRESSES[chain_id]
+    calls_per_vault = len(calldata_template)
+    calls = [(address, calldata) for address in addresses for calldata in calldata_template]
+
+    # Execute all calls in a single multicall round-trip
+    block_number, return_data = await multicall_aggregate(chain_id, calls)
+
+    # Process results for each vault
+    infos = {
+        address: _decode_vault_info(return_data, vault_index * calls_per_vault, bool(depositor))
+        for vault_index, address in enumerate(addresses)
+    }
+
+    return {"chain_id": chain_id, "block_number": block_number, "vaults": infos}
+
 @mcp.tool()
-async def get_all_logarithm_vault_info(depositor: Optional[str] = None) -> str:
-    """Returns a list of all available Logarithm vaults along with their information.
+async def get_all_logarithm_vault_info() -> dict:
+    """Returns all available Logarithm vaults along with their information.
+
+    The result is an object with `chain_id`, `block_number` and a `vaults`
+    mapping from vault address to its info.
     Vault Info Parameters Explained:
-        Address: The address of the vault.
-        Name: The name of the vault.
-        Symbol: The symbol of the vault.
-        Total Supply: The total supply of the vault in decimals.
-        Total Assets: The total assets of the vault in decimals.
-        Share Price: The current share price of the vault in decimals.
-        Entry Cost Rate: The entry cost rate in decimals which is applied to the depositor when they deposit.
-        Exit Cost Rate: The exit cost rate in decimals which is applied to the depositor when they withdraw.
-        Idle Assets: The idle assets of the vault in decimals, offsetting exit costs.
-        Total Pending Withdraw: The total pending withdraw of the vault in decimals, offsetting entry costs.
-        Max Deposit: The max deposit of the depositor in decimals (null if no depositor provided).
-        Share Balance: The share balance of the depositor in decimals (null if no depositor provided).
+        name: The name of the vault.
+        symbol: The symbol of the vault.
+        totalSupply: The total supply of the vault in decimals.
+        totalAssets: The total assets of the vault in decimals.
+        sharePrice: The current share price of the vault in decimals.
+        entryCostRate: The entry cost rate in decimals which is applied to the depositor when they deposit.
+        exitCostRate: The exit cost rate in decimals which is applied to the depositor when they withdraw.
+        idleAssets: The idle assets of the vault in decimals, offsetting exit costs.
+        totalPendingWithdraw: The total pending withdraw of the vault in decimals, offsetting entry costs.
+    """
+    return await _vault_infos()
+
+@mcp.tool()
+async def get_all_logarithm_vault_info_for_depositor(depositor: str) -> dict:
+    """Returns all available Logarithm vaults along with their information,
+    including fields scoped to the given depositor.
+
+    The result has the same shape as `get_all_logarithm_vault_info`, with two
+    extra fields per vault:
+        maxDeposit: The max deposit of the depositor in decimals.
+        balanceOf: The share balance of the depositor in decimals.
 
     Args:
-        depositor: The address of the depositor. If provided, additional information related to the depositor will be returned.
+        depositor: The address of the depositor.
     """
+    return await _vault_infos(validate_address(depositor))
 
-    chain_id = 42161 # only support arbitrum for now
-    
-    # Load ABIs
-    with open(LOGARITHM_VAULT_ABI_PATH, 'r') as f:
-        vault_abi = json.load(f)
-    
-    calls = []
-    
-    for address in LOGARITHM_VAULT_ADDRESSES[chain_id]:
-        # derive calldata for each function using ABI
-        name_calldata = encode_calldata(vault_abi, 'name')
-        symbol_calldata = encode_calldata(vault_abi, 'symbol')
-        totalSupply_calldata = encode_calldata(vault_abi, 'totalSupply')
-        totalAssets_calldata = encode_calldata(vault_abi, 'totalAssets')
-        entryCost_calldata = encode_calldata(vault_abi, 'entryCost')
-        exitCost_calldata = encode_calldata(vault_abi, 'exitCost')
-        idleAssets_calldata = encode_calldata(vault_abi, 'idleAssets')
-        totalPendingWithdraw_calldata = encode_calldata(vault_abi, 'totalPendingWithdraw')
-        
-        # Create list of calls for multicall
-        calls.extend([
-            (address, name_calldata),
-            (address, symbol_calldata),
-            (address, totalSupply_calldata),
-            (address, totalAssets_calldata),
-            (address, entryCost_calldata),
-            (address, exitCost_calldata),
-            (address, idleAssets_calldata),
-            (address, totalPendingWithdraw_calldata)
-        ])
-        
-        if depositor:
-            depositor = validate_address(depositor)
-            maxDeposit_calldata = encode_calldata(vault_abi, 'maxDeposit', [depositor])
-            balanceOf_calldata = encode_calldata(vault_abi, 'balanceOf', [depositor])
-            calls.extend([
-                (address, maxDeposit_calldata),
-                (address, balanceOf_calldata)
-            ])
-    
-    # Execute multicall
-    multicall = get_contract(MULTICALL_ADDRESSES[chain_id], MULTICALL_ABI_PATH, ALCHEMY_RPC_URLS[chain_id])
-    result = multicall.functions.tryBlockAndAggregate(False, calls).call()
-    
-    # Decode results
-    block_number, return_data = decode_multicall_try_block_and_aggregate_result(result)
-    
-    # Process results for each vault
-    infos = {}
-    current_index = 0
-    calls_per_vault = len(calls) // len(LOGARITHM_VAULT_ADDRESSES[chain_id])
-    for address in LOGARITHM_VAULT_ADDRESSES[chain_id]:
-        total_supply = from_szabo(decode_uint256(return_data[current_index + 2][1]))
-        total_assets = from_szabo(decode_uint256(return_data[current_index + 3][1]))
-        share_price = quantize_decimal(total_assets / total_supply)
-        # Parse results for this vault
-        infos[address] = {
-            f'name': decode_string(return_data[current_index][1]),
-            f'symbol': decode_string(return_data[current_index + 1][1]),
-            f'totalSupply': total_supply,
-            f'totalAssets': total_assets,
-            f'sharePrice': share_price,
-            f'entryCostRate': from_wei(decode_uint256(return_data[current_index + 4][1])),
-            f'exitCostRate': from_wei(decode_uint256(return_data[current_index + 5][1])),
-            f'idleAssets': from_szabo(decode_uint256(return_data[current_index + 6][1])),
-            f'totalPendingWithdraw': from_szabo(decode_uint256(return_data[current_index + 7][1]))
-        }
-        if depositor:
-            infos[address].update({
-                f'maxDeposit': from_szabo(decode_uint256(return_data[current_index + 8][1])),
-                f'balanceOf': from_szabo(decode_uint256(return_data[current_index + 9][1]))
-            })
-        
-        current_index += calls_per_vault
-
-    result = f"### Logarithm Vaults (Chain ID: {chain_id}, Block Number: {block_number})\n\n"
-    for address, info in infos.items():
-        result += f"Address: {address}\n"
-        result += f"Name: {info[f'name']}\n"
-        result += f"Symbol: {info[f'symbol']}\n"
-        result += f"Total Supply: {info[f'totalSupply']}\n"
-        result += f"Total Assets: {info[f'totalAssets']}\n"
-        result += f"Share Price: {info[f'sharePrice']}\n"
-        result += f"Entry Cost Rate: {info[f'entryCostRate']}\n"
-        result += f"Exit Cost Rate: {info[f'exitCostRate']}\n"
-        result += f"Idle Assets: {info[f'idleAssets']}\n"
-        result += f"Pending Withdraw: {info[f'totalPendingWithdraw']}\n"
-        if depositor:
-            result += f"Max Deposit: {info[f'maxDeposit']}\n"
-            result += f"Share Balance: {info[f'balanceOf']}\n"
-        result += "\n---\n\n"
-
-    return result
+# Formatted dates keyed by raw timestamp; history entries are daily, so this
+# stays small while deduplicating strftime work across vaults and requests
+_date_cache: dict = {}
 
 @mcp.tool()
 async def get_share_price_history(vault_addresses: List[str], length: int = 14) -> str:
@@ -150,7 +152,7 @@ async def get_share_price_history(vault_addresses: List[str], length: int = 14)
         validate_address(addr)
     
     # Get data from subgraph
-    vault_data = get_share_price_history_from_subgraph(vault_addresses, length, api_key)
+    vault_data = await get_share_price_history_from_subgraph(vault_addresses, length, api_key)
     
     # Check if data was returned
     if not vault_data:
@@ -162,36 +164,39 @@ async def get_share_price_history(vault_addresses: List[str], length: int = 14)
         raise ValueError(f"No price history available for any of the specified vaults in the last {length} days")
     
     # Format the result
-    result = f"### Vault Share Price History (Last {length} days)\n\n"
-    
+    parts = [f"### Vault Share Price History (Last {length} days)\n\n"]
+
     for vault_address, data in vault_data.items():
         if not data or 'name' not in data or 'price_history' not in data:
-            result += f"**Vault Address:** {vault_address}\n"
-            result += "**Status:** No data available\n\n---\n\n"
+            parts.append(f"**Vault Address:** {vault_address}\n")
+            parts.append("**Status:** No data available\n\n---\n\n")
             continue
-        
+
         price_history = data['price_history']
         if not price_history:
-            result += f"**Vault:** {data.get('name', 'Unknown')}\n"
-            result += f"**Address:** {vault_address}\n"
-            result += "**Status:** No price history available\n\n---\n\n"
+            parts.append(f"**Vault:** {data.get('name', 'Unknown')}\n")
+            parts.append(f"**Address:** {vault_address}\n")
+            parts.append("**Status:** No price history available\n\n---\n\n")
             continue
-        
-        result += f"**Vault:** {data['name']}\n"
-        result += f"**Address:** {vault_address}\n"
-        result += f"**Price History ({len(price_history)} entries):**\n"
-        
+
+        parts.append(f"**Vault:** {data['name']}\n")
+        parts.append(f"**Address:** {vault_address}\n")
+        parts.append(f"**Price History ({len(price_history)} entries):**\n")
+
         for timestamp, price in price_history:
-            try:
-                from datetime import datetime
-                date_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                result += f"  - {date_str} ({timestamp}): {price:.6f}\n"
-            except (ValueError, OSError) as e:
-                result += f"  - Invalid timestamp ({timestamp}): {price:.6f}\n"
-        
-        result += "\n---\n\n"
-    
-    return result
+            if 0 <= timestamp < 2**31:
+                # daily timestamps repeat across vaults, so cache the formatting
+                date_str = _date_cache.get(timestamp)
+                if date_str is None:
+                    date_str = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                    _date_cache[timestamp] = date_str
+                parts.append(f"  - {date_str} ({timestamp}): {price:.6f}\n")
+            else:
+                parts.append(f"  - Invalid timestamp ({timestamp}): {price:.6f}\n")
+
+        parts.append("\n---\n\n")
+
+    return "".join(parts)
         
         
 
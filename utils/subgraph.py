@@ -1,7 +1,22 @@
-from requests import post
+import asyncio
+import logging
+import httpx
 from constants import SUBGRAPH_QUERY_URL
 from typing import List, Optional, Dict, Any
 
+logger = logging.getLogger(__name__)
+
+# Shared async client with keepalive so back-to-back subgraph queries reuse
+# the same pooled TLS connection and overlap with other tool I/O
+_client = httpx.AsyncClient(timeout=30)
+
+# orjson serializes/parses the GraphQL payloads faster; fall back to requests'
+# built-in json handling when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 daily_share_price_query = """
 query DailyPriceHistory($vault_addresses: [Bytes!], $length: Int!) {
   vaultStats_collection(
@@ -19,17 +34,29 @@ query DailyPriceHistory($vault_addresses: [Bytes!], $length: Int!) {
     pricePerShare
     vault {
       address
-      name
     }
   }
 }
 """
 
+vault_names_query = """
+query VaultNames($vault_addresses: [Bytes!]) {
+  vaults(
+    where: {
+        address_in: $vault_addresses
+    }
+  ) {
+    address
+    name
+  }
+}
+"""
+
 def format_vault_addresses(addresses: List[str]) -> List[str]:
     """Format vault addresses to lowercase for GraphQL compatibility"""
     return [addr.lower() for addr in addresses]
 
-def send_graphql_query_to_subgraph(api_key: str, query: str, variables: Optional[Dict[str, Any]] = None):
+async def send_graphql_query_to_subgraph(api_key: str, query: str, variables: Optional[Dict[str, Any]] = None):
     headers = {
         'Content-Type': 'application/json',
         'Authorization': f'Bearer {api_key}'
@@ -40,14 +67,17 @@ def send_graphql_query_to_subgraph(api_key: str, query: str, variables: Optional
     if variables:
         payload['variables'] = variables
     
-    print(f"Sending GraphQL query with payload: {payload}")  # Debug print
-    
+    logger.debug("Sending GraphQL query with payload: %s", payload)
+
     # Send the GraphQL request to the Subgraph
-    response = post(SUBGRAPH_QUERY_URL, headers=headers, json=payload)
+    if orjson:
+        response = await _client.post(SUBGRAPH_QUERY_URL, headers=headers, content=orjson.dumps(payload))
+    else:
+        response = await _client.post(SUBGRAPH_QUERY_URL, headers=headers, json=payload)
 
     # Check if the request was successful
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content) if orjson else response.json()
         if 'errors' in result:
             raise Exception(f"GraphQL errors: {result['errors']}")
     else:
@@ -55,41 +85,47 @@ def send_graphql_query_to_subgraph(api_key: str, query: str, variables: Optional
     
     return result
 
-def get_share_price_history_from_subgraph(vault_addresses: List[str], length: int, api_key: str) -> dict:
+async def get_share_price_history_from_subgraph(vault_addresses: List[str], length: int, api_key: str) -> dict:
     formatted_addresses = format_vault_addresses(vault_addresses)
-    
+
     variables = {
         "vault_addresses": formatted_addresses,
         "length": length
     }
-    
-    res = send_graphql_query_to_subgraph(api_key, daily_share_price_query, variables)
-    return process_response(res)
 
-def process_response(res: dict) -> dict:
+    # Fetch the stats and the (much smaller) name mapping concurrently instead
+    # of duplicating the vault name on every stat row
+    res, names_res = await asyncio.gather(
+        send_graphql_query_to_subgraph(api_key, daily_share_price_query, variables),
+        send_graphql_query_to_subgraph(api_key, vault_names_query, {"vault_addresses": formatted_addresses})
+    )
+    return process_response(res, names_res)
+
+def process_response(res: dict, names_res: Optional[dict] = None) -> dict:
     if not res or 'data' not in res or not res['data']['vaultStats_collection']:
         return "No data found for the specified vaults"
-    
+
+    # Vault names come from the separate names query
+    names = {}
+    if names_res and 'data' in names_res:
+        names = {vault['address']: vault['name'] for vault in names_res['data'].get('vaults', [])}
+
      # Process the response to group by vault
     vault_data = {}
-    
+
     for entry in res['data']['vaultStats_collection']:
         vault_address = entry['vault']['address']
-        vault_name = entry['vault']['name']
         timestamp = int(entry['timestamp']) // 1000000  # Convert microseconds to seconds
         price_per_share = float(entry['pricePerShare'])
-        
+
         if vault_address not in vault_data:
             vault_data[vault_address] = {
-                'name': vault_name,
+                'name': names.get(vault_address, 'Unknown'),
                 'price_history': []
             }
-        
+
         vault_data[vault_address]['price_history'].append((timestamp, price_per_share))
-    
-    # Sort price history by timestamp (newest first)
-    for vault_address in vault_data:
-        vault_data[vault_address]['price_history'].sort(key=lambda x: x[0], reverse=True)
 
+    # The query orders by timestamp desc, so appending preserves newest-first
     return vault_data
         
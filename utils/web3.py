@@ -1,24 +1,110 @@
 from typing import List, Dict, Any, Optional, Tuple
+import functools
 import json
+import time
+import httpx
+import requests
+
+# orjson parses the large ABI files ~3-5x faster; fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from requests.adapters import HTTPAdapter
 from web3 import Web3
 from web3.contract import Contract
+from eth_abi import encode as abi_encode, decode as abi_decode
 from eth_typing import ChecksumAddress
 from decimal import Decimal
+from constants import MULTICALL_ADDRESSES, MULTICALL_ABI_PATH, ALCHEMY_RPC_URLS
+
+
+# Shared keep-alive session so every RPC reuses the same pooled TLS connections
+# instead of paying a TCP + TLS handshake per tool invocation
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=2))
+
+@functools.lru_cache(maxsize=None)
+def get_w3(rpc_url: Optional[str] = None) -> Web3:
+    """Get a Web3 instance for an RPC URL, reusing one instance per endpoint.
+
+    No connectivity probe is made here; an unreachable endpoint surfaces as a
+    connection error on the first actual call.
+    """
+    return Web3(Web3.HTTPProvider(rpc_url, session=_session))
 
+@functools.lru_cache(maxsize=None)
+def load_abi(abi_file_path: str) -> list:
+    """Load and parse an ABI file, caching the result per path."""
+    with open(abi_file_path, 'rb') as abi_file:
+        data = abi_file.read()
+    return orjson.loads(data) if orjson else json.loads(data)
 
+@functools.lru_cache(maxsize=64)
 def get_contract(contract_address: str, abi_file_path: str, rpc_url: Optional[str] = None) -> Contract:
-    """Get a smart contract contract instance on Arbitrum One."""
-    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    """Get a smart contract contract instance on Arbitrum One.
+
+    Instances are cached per (address, abi_path, rpc_url); Contract objects
+    are immutable once bound, so repeated tool calls reuse the same one.
+    """
+    w3 = get_w3(rpc_url)
 
-    # Verify connection
-    if not w3.is_connected():
-        raise ConnectionError(f"Failed to connect to {rpc_url}")
-    
     # Use checksum address
     address = validate_address(contract_address)
-    with open(abi_file_path) as abi_file:
-        abi = json.load(abi_file)
-        return w3.eth.contract(address=address, abi=abi)
+    return w3.eth.contract(address=address, abi=load_abi(abi_file_path))
+
+# View results only change at block boundaries (~0.25 s on Arbitrum), so a
+# sub-second cache absorbs bursts of identical tool calls without extra RPCs
+MULTICALL_CACHE_TTL = 0.5
+_multicall_cache: Dict[tuple, Tuple[float, Tuple[int, list]]] = {}
+
+# Async client with keepalive for raw JSON-RPC requests, so RPC I/O overlaps
+# with other tool invocations on the event loop
+_async_client = httpx.AsyncClient(timeout=30)
+
+async def eth_call(rpc_url: str, to: str, data: str) -> bytes:
+    """Issue a raw JSON-RPC eth_call and return the decoded result bytes."""
+    payload = {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_call', 'params': [{'to': to, 'data': data}, 'latest']}
+    response = await _async_client.post(rpc_url, json=payload)
+    # Fail cleanly on gateway/rate-limit pages before attempting to parse JSON
+    response.raise_for_status()
+    result = orjson.loads(response.content) if orjson else response.json()
+    if 'result' not in result:
+        raise ValueError(f"eth_call failed: {result.get('error')}")
+    return bytes.fromhex(result['result'][2:])
+
+async def multicall_aggregate(chain_id: int, calls: List[Tuple[str, bytes]]) -> Tuple[int, List[Tuple[bool, bytes]]]:
+    """Batch multiple eth_calls into a single Multicall3 aggregate3 round-trip.
+
+    Args:
+        calls: List of (target_address, calldata) tuples.
+
+    Returns:
+        Tuple of (block_number, list of (success, return_data)).
+    """
+    cache_key = (chain_id, tuple(calls))
+    cached = _multicall_cache.get(cache_key)
+    now = time.monotonic()
+    if cached and now - cached[0] < MULTICALL_CACHE_TTL:
+        return cached[1]
+
+    multicall_address = MULTICALL_ADDRESSES[chain_id]
+    # aggregate3 doesn't report the block number, so piggyback Multicall3's own
+    # getBlockNumber() as the last call of the batch instead of a second RPC
+    calls3 = [(address, True, calldata) for address, calldata in calls]
+    calls3.append((multicall_address, True, encode_calldata(MULTICALL_ABI_PATH, 'getBlockNumber')))
+
+    # build and send the eth_call directly, skipping web3.py's contract wrapper
+    payload = get_function_selector(MULTICALL_ABI_PATH, 'aggregate3') + abi_encode(['(address,bool,bytes)[]'], [calls3])
+    raw = await eth_call(ALCHEMY_RPC_URLS[chain_id], multicall_address, f'0x{payload.hex()}')
+    return_data = abi_decode(['(bool,bytes)[]'], raw)[0]
+    block_number = decode_uint256(return_data[-1][1])
+    result = (block_number, return_data[:-1])
+
+    if len(_multicall_cache) > 256:
+        _multicall_cache.clear()
+    _multicall_cache[cache_key] = (now, result)
+    return result
 
 def format_transaction_data(tx_data: Dict[str, Any]) -> str:
     """Format transaction data for user to sign."""
@@ -32,6 +118,8 @@ def format_transaction_data(tx_data: Dict[str, Any]) -> str:
         "nonce": tx_data.get("nonce", "AUTO"),
         "chainId": 42161,  # Arbitrum One
     }
+    if orjson:
+        return orjson.dumps(formatted, option=orjson.OPT_INDENT_2).decode()
     return json.dumps(formatted, indent=2)
 
 def validate_address(address: str) -> str:
@@ -51,55 +139,68 @@ def to_hex(value: str) -> str:
 
 def from_wei(value: str) -> Decimal:
     """Convert a value in wei to a decimal with the specified number of decimals."""
-    return quantize_decimal(Decimal(value) / Decimal(1e18))
+    # scaleb shifts the exponent instead of dividing, which is exact and cheap
+    return quantize_decimal(Decimal(value).scaleb(-18))
 
 def from_szabo(value: str) -> Decimal:
     """Convert a value in szabo to a decimal with the specified number of decimals."""
-    return quantize_decimal(Decimal(value) / Decimal(1e6))
+    # szabo values are already 6-decimal fixed point, so no quantize needed
+    return Decimal(value).scaleb(-6)
+
+@functools.lru_cache(maxsize=None)
+def _quantize_exponent(decimals: int) -> Decimal:
+    return Decimal(f'1e-{decimals}')
 
 def quantize_decimal(value: Decimal, decimals: int = 6) -> Decimal:
     """Quantize a decimal to the specified number of decimals."""
-    return value.quantize(Decimal(f'1e-{decimals}'))
+    return value.quantize(_quantize_exponent(decimals))
+
+def canonical_type(abi_input) -> str:
+    """Canonical ABI type of an input, expanding tuple components."""
+    if abi_input['type'].startswith('tuple'):
+        components = ','.join(canonical_type(component) for component in abi_input['components'])
+        return f"({components}){abi_input['type'][5:]}"
+    return abi_input['type']
+
+@functools.lru_cache(maxsize=32)
+def _abi_index(abi_file_path: str) -> dict:
+    """Map function name to (selector, input types), hashed once per ABI file."""
+    index = {}
+    for item in load_abi(abi_file_path):
+        if item['type'] == 'function' and item['name'] not in index:
+            types = tuple(canonical_type(input) for input in item['inputs'])
+            selector = bytes(Web3.keccak(text=f"{item['name']}({','.join(types)})")[:4])
+            index[item['name']] = (selector, types)
+    return index
 
-def get_function_selector(abi, function_name):
+def get_function_selector(abi_file_path: str, function_name: str) -> Optional[bytes]:
     """Get function selector from ABI"""
-    for item in abi:
-        if item['type'] == 'function' and item['name'] == function_name:
-            return Web3.keccak(text=f"{function_name}({','.join([input['type'] for input in item['inputs']])})")[:4].hex()
-    return None
+    entry = _abi_index(abi_file_path).get(function_name)
+    return entry[0] if entry else None
 
-def encode_calldata(abi, function_name, args=None):
+def encode_calldata(abi_file_path: str, function_name: str, args=None) -> bytes:
     """Encode function call data using ABI"""
-    if args is None:
-        args = []
-    
-    # Find the function in ABI
-    function_abi = None
-    for item in abi:
-        if item['type'] == 'function' and item['name'] == function_name:
-            function_abi = item
-            break
-    
-    if not function_abi:
+    entry = _abi_index(abi_file_path).get(function_name)
+    if not entry:
         raise ValueError(f"Function {function_name} not found in ABI")
-    
-    # Get function selector
-    selector = get_function_selector(abi, function_name)
-    
-    # Encode parameters
+
+    selector, input_types = entry
     if args:
-        encoded_args = Web3().codec.encode_abi(
-            [input['type'] for input in function_abi['inputs']],
-            args
-        ).hex()
-    else:
-        encoded_args = ''
-    
-    return f"0x{selector}{encoded_args}"
+        return selector + abi_encode(list(input_types), args)
+    return selector
+
+def encode_address_calldata(selector: bytes, address: str) -> bytes:
+    """Encode calldata for a function taking a single address argument.
+
+    The address is left-padded to a 32-byte word and appended to the 4-byte
+    selector directly, bypassing the general ABI encoder. The caller is
+    expected to have validated the address already.
+    """
+    return selector + bytes(12) + bytes.fromhex(address[2:])
 
 def decode_string(data: bytes) -> str:
-    len = int.from_bytes(data[32:64], byteorder='big')
-    return Web3.to_text(data[64:64+len])
+    """Decode an ABI-encoded string return value."""
+    return abi_decode(['string'], data)[0]
 
 def decode_uint256(data: bytes) -> int:
     """Decode uint256 from bytes."""
@@ -109,15 +210,24 @@ def decode_bool(data: bytes) -> bool:
     """Decode bool from bytes."""
     return bool(int.from_bytes(data, byteorder='big'))
 
-def decode_multicall_try_block_and_aggregate_result(result: Tuple[int, bytes, List[Tuple[bool, bytes]]]) -> Tuple[int, List[Tuple[bool, bytes]]]:
-    """Decode multicall result tuple.
-    
+def decode_return_batch(return_data: List[Tuple[bool, bytes]], offset: int, schema: Tuple[Tuple[str, int], ...]) -> tuple:
+    """Decode a contiguous slice of multicall return data in one pass.
+
     Args:
-        result: Tuple containing (block_number, block_hash, [(success, return_data), ...])
-    
+        return_data: List of (success, return_data) tuples.
+        offset: Index of the first entry to decode.
+        schema: (kind, scale) pairs per entry, where kind is 'str' or 'uint'
+            and scale is the number of decimal places to shift uints by.
+
     Returns:
-        Tuple of (block_number, list of (success, return_data))
+        Tuple of decoded values in schema order.
     """
-    block_number = result[0]
-    return block_number, result[2]  # Skip block_hash (result[1])
-    r
\ No newline at end of file
+    values = []
+    for i, (kind, scale) in enumerate(schema):
+        data = return_data[offset + i][1]
+        if kind == 'uint':
+            value = Decimal(int.from_bytes(data, byteorder='big'))
+            values.append(value.scaleb(-scale) if scale else value)
+        else:
+            values.append(decode_string(data))
+    return tuple(values)
\ No newline at end of file